@@ -57,6 +57,13 @@ class PoseNetwork:
         self.prefix_length = prefix_length
         self.num_joints = num_joints
         self.loss_mode = loss_mode
+
+        # CUDA Graph replay of the inference rollout; see enable_cuda_graphs()
+        self._use_cuda_graphs = False
+        self._cuda_graphs = {}
+
+        # pinned staging buffer for host-to-device prefix transfers
+        self._pinned_in = None
         
         self.set_selected_joints(selected_joints)
         
@@ -122,9 +129,58 @@ class PoseNetwork:
         ------
             self
         """
-        
+
         self.model.eval()
         return self
+
+
+    def quantize(self):
+        """
+        Dynamically quantize the linear layers of the model to int8 for
+        CPU inference; the GRU stays in FP32. Call after load_weights(),
+        and only for CPU deployments.
+        Input
+        -----
+            None
+        Output
+        ------
+            self
+        """
+
+        assert not self.use_cuda
+        self.model = torch.quantization.quantize_dynamic(
+            self.model, { nn.Linear }, dtype = torch.qint8
+        )
+        return self
+
+
+    def compile_model(self):
+        """
+        Compile the QuaterNet model with TorchScript (torch.jit.script)
+        for inference; the eager module is kept around for training.
+        The scripted graph is frozen and the profiling executor is
+        disabled, so evaluation runs with different rollout lengths do
+        not re-trigger the per-shape warmup optimization.
+        Input
+        -----
+            None
+        Output
+        ------
+            self
+        """
+
+        # the profiling executor re-optimizes on every new input shape,
+        # making the first call at each (batch, length) pair pay a large
+        # warmup cost; plain execution avoids that cliff
+        torch._C._jit_set_profiling_executor(False)
+        torch._C._jit_set_profiling_mode(False)
+
+        self._eager_model = self.model
+        scripted = torch.jit.script( self.model.eval() )
+        self.model = torch.jit.freeze(
+            scripted, preserved_attrs = ['rollout', '_h0_buf', '_qmul_buf']
+        )
+        return self
     
 
     def set_selected_joints(self, selected_joints):
@@ -254,14 +310,13 @@ class PoseNetwork:
                     predictions = []
 
                     # ------------- Forward propagation -------------
-                        
+
                         # x = inputs[:, :self.prefix_length]
                         # h = None
-                        # return_prenorm = True
                         # return_all = False (default)
 
                     predicted , hidden, term = self.model(
-                        inputs[:, :self.prefix_length], None, True
+                        inputs[:, :self.prefix_length]
                     )
 
                     terms.append(term)
@@ -279,7 +334,7 @@ class PoseNetwork:
                                 contiguous_frames += 1
                             # feed ground truth
                             predicted, hidden, term = self.model(
-                                    inputs[:, self.prefix_length+i:self.prefix_length+i+contiguous_frames], hidden, True, True
+                                    inputs[:, self.prefix_length+i:self.prefix_length+i+contiguous_frames], hidden, True
                             )
                         else:
                             # feed own output
@@ -287,7 +342,7 @@ class PoseNetwork:
                                 predicted = torch.cat( (
                                     predicted, inputs[:, self.prefix_length+i:self.prefix_length+i+1, -self.controls_size:]
                                 ), dim = 2 )
-                            predicted, hidden, term = self.model(predicted, hidden, True)
+                            predicted, hidden, term = self.model(predicted, hidden)
                         # -----------------------------------------------
 
                         terms.append(term)
@@ -326,7 +381,7 @@ class PoseNetwork:
                 if len(sequences_valid) > 0:
                     with torch.no_grad():
                         predictions = []
-                        predicted, hidden = self.model(
+                        predicted, hidden, _ = self.model(
                             inputs_valid[:, :self.prefix_length]
                         )
                         predictions.append(predicted)
@@ -337,7 +392,7 @@ class PoseNetwork:
                                     ( predicted, inputs_valid[:, (self.prefix_length+i):(self.prefix_length+i+1), - self.controls_size:]), dim =  2 
                                 )
                             
-                            predicted, hidden = self.model(predicted, hidden)
+                            predicted, hidden, _ = self.model(predicted, hidden)
                             predictions.append(predicted)
                             
                         predictions = torch.cat( predictions, dim = 1 )
@@ -368,44 +423,120 @@ class PoseNetwork:
 
     def predict(self, prefix, target_length):
         """
-        Predict a skeleton sequence , given a prefix.
+        Predict skeleton sequences, given a batch of prefixes.
         Input
         -----
-            * prefix : input; quaternions.
+            * prefix : input; quaternions with dimensions
+                       (batch_size, prefix_length, num_joints * 4).
             * target_length : target sequence length.
         Output
         ------
-            * predicted sequence; quaternions.
+            * predicted sequences; quaternions.
         """
 
         assert target_length > 0
 
-        
-        with torch.no_grad():
-            # quaternions --> euler angle --> quaternions  
-            prefix = prefix.reshape( prefix.shape[1], -1 , 4 )
-            prefix = qeuler_np( prefix, 'zyx' )
-            prefix = qfix( euler_to_quaternion(prefix, 'zyx') )
-            inputs = torch.from_numpy(
-                prefix.reshape(1, prefix.shape[0], -1).astype('float32')
-            )
 
-            # input to cuda
+        with torch.no_grad():
+            # quaternions --> euler angle --> quaternions
+            # (per sequence, so qfix continuity stays within each sequence)
+            batch = []
+            for seq in prefix:
+                seq = seq.reshape( seq.shape[0], -1 , 4 )
+                seq = qeuler_np( seq, 'zyx' )
+                seq = qfix( euler_to_quaternion(seq, 'zyx') )
+                batch.append( seq.reshape( seq.shape[0], -1 ) )
+            inputs = torch.from_numpy( np.stack(batch).astype('float32') )
+
+            # input to cuda, staged through a reusable pinned-memory
+            # buffer so the upload is one asynchronous transfer instead
+            # of a pageable synchronous copy per call
             if self.use_cuda:
-                inputs = inputs.cuda()
+                if self._pinned_in is None or self._pinned_in.shape != inputs.shape:
+                    self._pinned_in = torch.empty_like(inputs).pin_memory()
+                self._pinned_in.copy_(inputs)
+                inputs = self._pinned_in.to( 'cuda', non_blocking = True )
 
             # evaluate model
-            predicted, hidden = self.model(inputs)
-            frames = [predicted]
-            for i in range(1, target_length):
-                predicted, hidden = self.model(predicted, hidden)
-                frames.append(predicted)
-            
-            # result
-            result = torch.cat( frames, dim = 1 )
-            
+            if self._use_cuda_graphs and self.use_cuda:
+                result = self._rollout_graphed(inputs, target_length)
+            else:
+                result = self._rollout(inputs, target_length)
+
             return result.view( result.shape[0], result.shape[1], -1, 4).cpu().numpy()
 
+
+    def _rollout(self, inputs, target_length):
+        """
+        Autoregressive rollout: feed the prefix, then feed back the last
+        prediction for target_length - 1 steps.
+        Input
+        -----
+            * inputs : prefix tensor (batch_size, prefix_length, num_joints * 4).
+            * target_length : number of frames to generate.
+        Output
+        ------
+            * predicted sequence tensor.
+        """
+
+        return self.model.rollout(inputs, target_length)
+
+
+    def _rollout_graphed(self, inputs, target_length):
+        """
+        Replay the rollout through a CUDA Graph, capturing it on first
+        use for each (batch_size, target_length) pair. Replaying removes
+        the per-kernel launch overhead that dominates the small-batch
+        evaluation rollout.
+        Input
+        -----
+            * inputs : prefix tensor, already on the GPU.
+            * target_length : number of frames to generate.
+        Output
+        ------
+            * predicted sequence tensor.
+        """
+
+        key = ( inputs.shape[0], target_length )
+        if key not in self._cuda_graphs:
+            static_in = inputs.clone()
+
+            # warmup on a side stream before capture
+            stream = torch.cuda.Stream()
+            stream.wait_stream( torch.cuda.current_stream() )
+            with torch.cuda.stream(stream):
+                for _ in range(2):
+                    self._rollout(static_in, target_length)
+            torch.cuda.current_stream().wait_stream(stream)
+
+            graph = torch.cuda.CUDAGraph()
+            with torch.cuda.graph(graph):
+                static_out = self._rollout(static_in, target_length)
+            self._cuda_graphs[key] = ( graph, static_in, static_out )
+
+        graph, static_in, static_out = self._cuda_graphs[key]
+        static_in.copy_(inputs)
+        graph.replay()
+
+        return static_out.clone()
+
+
+    def enable_cuda_graphs(self):
+        """
+        Enable CUDA Graph capture/replay of the inference rollout in
+        predict(). Requires the model to be on the GPU.
+        Input
+        -----
+            None
+        Output
+        ------
+            self
+        """
+
+        assert self.use_cuda
+        self._use_cuda_graphs = True
+        return self
+
             
     def save_weights(self, model_file):
         """
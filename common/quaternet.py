@@ -6,7 +6,72 @@
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from common.quaternion import qmul
+from torch import Tensor
+from typing import Optional, Tuple
+from common.quaternion import _qmul, _qmul_out
+
+
+@torch.jit.script
+def _linear_lrelu(x, weight, bias : Optional[Tensor], negative_slope : float):
+    """
+    Linear layer followed by LeakyReLU as one scripted unit, so the bias
+    add and the activation fuse; on a frozen module the weights fold
+    into the graph as constants.
+    """
+
+    return F.leaky_relu( F.linear(x, weight, bias), negative_slope )
+
+
+@torch.jit.script
+def _qnorm(q):
+    """
+    Normalize quaternion(s) in a single fused reduce + broadcast pass:
+    one rsqrt of the squared norm and one multiply, instead of the
+    norm + div pair (two passes and a temporary) of F.normalize.
+    """
+
+    return q * torch.rsqrt( (q*q).sum(-1, keepdim = True).clamp_min(1e-12) )
+
+
+@torch.jit.script
+def _forward_tail( x, x_orig, qmul_buf : Optional[Tensor], num_joints : int,
+                   num_outputs : int, model_velocities : bool ) -> Tuple[Tensor, Tensor]:
+    """
+    Post-RNN tail of QuaterNet.forward(): slice the quaternion block,
+    optionally compose with the previous frame (velocity modeling),
+    normalize, and append the extra features back. Scripted so the
+    pointwise ops fuse into a single kernel instead of ~5 eager passes
+    over the (batch, frames, 4 * num_joints) tensor.
+    """
+
+    # normalize only quaternion rotations; the (B, T, J, 4) reshape is a
+    # pure view whenever the slice is contiguous (always if there are no
+    # extra outputs), so no .contiguous() copy is forced
+    pre_normalized = x[:, :, :(4*num_joints)]
+    normalized = pre_normalized.reshape( x.shape[0], x.shape[1], num_joints, 4 )
+
+    # --- Residual arquitecture to model velocities -- #
+    if model_velocities:
+        prev = x_orig[:, :, :(4*num_joints)].reshape( x_orig.shape[0], x_orig.shape[1], num_joints, 4 )
+        if qmul_buf is not None:
+            # inference: write the product into the preallocated buffer
+            normalized = _qmul_out( normalized, prev, qmul_buf )
+        else:
+            normalized = _qmul( normalized, prev )
+    # ------------------------------------------------ #
+
+    # Normalize quaternions
+    normalized = _qnorm( normalized ).reshape( x.shape[0], x.shape[1], 4*num_joints )
+
+    # ---- Add extra features (if extra features) ---- #
+    if num_outputs > 0:
+        x = torch.cat( (normalized, x[:, :, (4*num_joints):]), dim = 2 )
+    else:
+        x = normalized
+    # ------------------------------------------------ #
+
+    return x, pre_normalized
+
 
 class QuaterNet(nn.Module):
     """
@@ -25,9 +90,11 @@ class QuaterNet(nn.Module):
     Methods
     -------
         * __init__() : initialization
-        * forward()  : forward propagation 
+        * forward()  : forward propagation
     """
 
+    # compile-time constants, so scripted code specializes the branches
+    __constants__ = [ 'num_joints', 'num_outputs', 'num_controls', 'model_velocities', 'fc2_size' ]
 
     def __init__( self, num_joints, num_outputs = 0,
                   num_controls = 0, model_velocities = False ):
@@ -61,9 +128,12 @@ class QuaterNet(nn.Module):
             fc2_size = 30
             self.fc1 = nn.Linear(num_controls, fc1_size)
             self.fc2 = nn.Linear(fc1_size, fc2_size)
-            self.relu = nn.LeakyReLU(0.05, inplace = True)
+            # non-inplace: the inplace variant blocks some JIT fusions
+            # and would hazard reuse of the fc outputs
+            self.relu = nn.LeakyReLU(0.05, inplace = False)
         else:
             fc2_size = 0
+        self.fc2_size = fc2_size
         # ------------------------------------------------ #
 
         # ------------ Gated Recurrent Units ------------- #
@@ -80,13 +150,22 @@ class QuaterNet(nn.Module):
         # Initializing hidden state
         self.h0 = nn.Parameter( torch.zeros( rnn_layers, 1, h_size).normal_(std = 0.01),
                                 requires_grad = True )
-        
+
+        # Cached expansion of h0, reused across inference calls so the
+        # per-forward allocation + copy of the hidden state goes away.
+        self.register_buffer( '_h0_buf', torch.empty(0), persistent = False )
+
+        # Cached quaternion-product buffer for the velocity branch, so
+        # qmul does not allocate on every step of an inference rollout.
+        self.register_buffer( '_qmul_buf', torch.empty(0), persistent = False )
+
         # Output fully connected layer
         self.fc = nn.Linear(h_size, 4 * num_joints + num_outputs)
     
 
 
-    def forward(self, x, h = None, return_prenorm = False, return_all = False):
+    def forward( self, x, h : Optional[Tensor] = None,
+                 return_all : bool = False ) -> Tuple[Tensor, Tensor, Tensor]:
         """
         Forward propagation.
         Input
@@ -94,12 +173,12 @@ class QuaterNet(nn.Module):
             * x : input tensor
                   size = ( batch_size, sequence_length, 4 * num_joints + num_outputs + fc2_size)
             * h : hidden state; if None, it returns to the learned initial state
-            * return_prenorm : flag -> if True, it returns the quaternions prior to normalization
-            * return_all     : flag -> if True, it returns all sencuance_lenght frames,
-                                       otherwise, it returns only the last frame.
+            * return_all : flag -> if True, it returns all sequence_length frames,
+                                   otherwise, it returns only the last frame.
         Output
         ------
-            model evaluation
+            * (x, h, pre_normalized) : model evaluation, hidden state and
+              the quaternions prior to normalization.
         """
 
         assert len(x.shape) == 3
@@ -109,15 +188,38 @@ class QuaterNet(nn.Module):
 
         # ----- ReLU Layers (if extra input features) ---- #
         if self.num_controls > 0:
-            controls = x[:, :, (4*self.num_joints + self.num_outputs):]
-            controls = self.relu( self.fc1(controls) )
-            controls = self.relu( self.fc2(controls) )
-            x = torch.cat( ( x[:, :, :(4*self.num_joints + self.num_outputs)], controls), dim = 2 )
+            k = 4*self.num_joints + self.num_outputs
+            if self.training:
+                # eager path for training
+                controls = self.relu( self.fc1( x[:, :, k:] ) )
+                controls = self.relu( self.fc2(controls) )
+            else:
+                # fused linear + activation blocks for inference
+                controls = _linear_lrelu( x[:, :, k:], self.fc1.weight, self.fc1.bias, 0.05 )
+                controls = _linear_lrelu( controls, self.fc2.weight, self.fc2.bias, 0.05 )
+            # write both sections into one preallocated buffer, instead of
+            # reallocating the full input tensor with torch.cat
+            out = x.new_empty( x.shape[0], x.shape[1], k + self.fc2_size )
+            out.narrow(2, 0, k).copy_( x[:, :, :k] )
+            out.narrow(2, k, self.fc2_size).copy_( controls )
+            x = out
         # ------------------------------------------------ #
         
         # ------------ Gated Recurrent Units ------------- #
+        # contiguous input up front, to stay on the fused cuDNN path
+        if not x.is_contiguous():
+            x = x.contiguous()
         if h is None:
-            h = self.h0.expand(-1, x.shape[0], -1).contiguous()
+            h0 = self.h0.expand( -1, x.shape[0], -1 )
+            if torch.is_grad_enabled():
+                # training: keep the differentiable copy so h0 is learned
+                h = h0.contiguous()
+            else:
+                # inference: reuse the cached buffer, resized on batch change
+                if self._h0_buf.shape != h0.shape:
+                    self._h0_buf.resize_( h0.shape )
+                self._h0_buf.copy_( h0 )
+                h = self._h0_buf
         x, h = self.rnn(x, h)
         # ------------------------------------------------ #
 
@@ -128,27 +230,43 @@ class QuaterNet(nn.Module):
             x = self.fc( x[:, -1:] )
             x_orig = x_orig[:, -1:]
 
-        # normalize only quaternion rotations
-        pre_normalized = x[:, :, :(4*self.num_joints)].contiguous()
-        normalized = pre_normalized.view(-1, 4)
-        
-        # --- Residual arquitecture to model velocities -- #
-        if self.model_velocities:
-            normalized = qmul( normalized, x_orig[:, :, :(4*self.num_joints)].contiguous().view(-1, 4) )
-        # ------------------------------------------------ #
+        # reuse the product buffer at inference (resize_ is a no-op when
+        # the batch/frame sizes are unchanged); training needs the fresh
+        # allocation for autograd
+        qmul_buf : Optional[Tensor] = None
+        if self.model_velocities and not torch.is_grad_enabled():
+            self._qmul_buf.resize_( [ x.shape[0], x.shape[1], self.num_joints, 4 ] )
+            qmul_buf = self._qmul_buf
 
-        # Normalize quaternions
-        normalized = F.normalize( normalized, dim = 1 ).view( pre_normalized.shape )
+        # fused slicing / velocity composition / normalization / cat
+        x, pre_normalized = _forward_tail( x, x_orig, qmul_buf, self.num_joints,
+                                           self.num_outputs, self.model_velocities )
 
-        # ---- Add extra features (if extra features) ---- #
-        if self.num_outputs > 0:
-            x = torch.cat( (normalized, x[:, :, (4*self.num_joints):]), dim = 2 )
-        else:
-            x = normalized
-        # ------------------------------------------------ #
-        
         # Output
-        if return_prenorm:
-            return x, h, pre_normalized
-        else:
-            return x, h
\ No newline at end of file
+        return x, h, pre_normalized
+
+
+    @torch.jit.export
+    def rollout(self, prefix : Tensor, target_length : int) -> Tensor:
+        """
+        Autoregressive rollout: feed the prefix once, then feed each
+        prediction back for target_length - 1 steps.
+        Lives on the module (and is exported) so that, once the model is
+        scripted, the whole loop runs without per-step Python dispatch.
+        Input
+        ------
+            * prefix : input tensor
+                       size = ( batch_size, prefix_length, 4 * num_joints + num_outputs + fc2_size)
+            * target_length : number of frames to generate.
+        Output
+        ------
+            * predicted sequence tensor.
+        """
+
+        predicted, hidden, _ = self.forward(prefix)
+        frames = [predicted]
+        for i in range(1, target_length):
+            predicted, hidden, _ = self.forward(predicted, hidden)
+            frames.append(predicted)
+
+        return torch.cat( frames, dim = 1 )
\ No newline at end of file
@@ -8,6 +8,43 @@ import numpy as np
 
 # PyTorch based implementations of Quaternion methods
 
+@torch.jit.script
+def _qmul_out(q, r, out):
+    """
+    Hamilton product computed component-wise and written directly into a
+    caller-provided tensor: the 16 multiplies and 12 add/subs fuse into
+    elementwise kernels with no bmm, no (N, 4, 4) outer-product
+    temporary, and no stack copy.
+    """
+
+    q0 = q.select(-1, 0)
+    q1 = q.select(-1, 1)
+    q2 = q.select(-1, 2)
+    q3 = q.select(-1, 3)
+
+    r0 = r.select(-1, 0)
+    r1 = r.select(-1, 1)
+    r2 = r.select(-1, 2)
+    r3 = r.select(-1, 3)
+
+    out[..., 0] = q0*r0 - q1*r1 - q2*r2 - q3*r3
+    out[..., 1] = q0*r1 + q1*r0 + q2*r3 - q3*r2
+    out[..., 2] = q0*r2 + q2*r0 + q3*r1 - q1*r3
+    out[..., 3] = q0*r3 + q3*r0 + q1*r2 - q2*r1
+
+    return out
+
+
+@torch.jit.script
+def _qmul(q, r):
+    """
+    Allocating variant of _qmul_out: one torch.empty_like for the
+    product, no intermediate component stack.
+    """
+
+    return _qmul_out( q, r, torch.empty_like(q) )
+
+
 def qmul(q, r):
     """
     Multiply quaternion(s) q with quaternion(s) r.
@@ -26,17 +63,101 @@ def qmul(q, r):
     assert q.shape[-1] == 4
     assert r.shape[-1] == 4
 
-    original_shape = q.shape
+    return _qmul(q, r)
 
-    # quaternions outer product
-    terms = torch.bmm( r.view(-1, 4, 1 ), q.view(-1, 1, 4) )
 
-    w = terms[:, 0, 0] - terms[:, 1, 1] - terms[:, 2, 2] - terms[:, 3, 3]
-    x = terms[:, 0, 1] + terms[:, 1, 0] - terms[:, 2, 3] + terms[:, 3, 2]
-    y = terms[:, 0, 2] + terms[:, 1, 3] + terms[:, 2, 0] - terms[:, 3, 1]
-    z = terms[:, 0, 3] - terms[:, 1, 2] + terms[:, 2, 1] + terms[:, 3, 0]
+# Hamilton product structure constants: product_k = sum_ij SIGN[i,j,k] * r_i * q_j,
+# the same coefficients as the (r, q) outer-product formulation that the
+# fused kernel replaced.
+_QMUL_SIGNS = torch.zeros(4, 4, 4)
+for _i, _j, _k, _s in [ (0,0,0, 1), (1,1,0,-1), (2,2,0,-1), (3,3,0,-1) ,
+                        (0,1,1, 1), (1,0,1, 1), (2,3,1,-1), (3,2,1, 1) ,
+                        (0,2,2, 1), (1,3,2, 1), (2,0,2, 1), (3,1,2,-1) ,
+                        (0,3,3, 1), (1,2,3,-1), (2,1,3, 1), (3,0,3, 1) ]:
+    _QMUL_SIGNS[_i, _j, _k] = _s
 
-    return torch.stack( (w,x,y,z), dim = 1 ).view( original_shape )
+
+def qmul_ref(q, r):
+    """
+    Reference implementation of qmul as a single einsum contraction with
+    the quaternion structure constants, with no (N, 4, 4) outer-product
+    temporary. Kept for numerical verification of the fused kernel; not
+    used on the hot path.
+    Input
+    ------
+        * q : tensor with dimensions (N, 4) ; quaternion(s)
+        * r : tensor with dimensions (N, 4) ; quaternion(s)
+
+        N -> number of quaternions in the tensors
+
+    Output
+    ------
+        * Tensor with dimensions (N ,4) ; quaternion(s) product
+    """
+
+    assert q.shape[-1] == 4
+    assert r.shape[-1] == 4
+
+    signs = _QMUL_SIGNS.to( device = q.device, dtype = q.dtype )
+
+    return torch.einsum( 'ni,nj,ijk->nk',
+                         r.reshape(-1, 4), q.reshape(-1, 4), signs ).reshape( q.shape )
+
+
+def qmul_out(q, r, out):
+    """
+    Multiply quaternion(s) q with quaternion(s) r, writing the product
+    into a caller-provided tensor.
+    Input
+    ------
+        * q   : tensor with dimensions (N, 4) ; quaternion(s)
+        * r   : tensor with dimensions (N, 4) ; quaternion(s)
+        * out : tensor with dimensions (N, 4) ; product destination
+
+        N -> number of quaternions in the tensors
+
+    Output
+    ------
+        * out ; quaternion(s) product
+    """
+
+    assert q.shape[-1] == 4
+    assert r.shape[-1] == 4
+    assert out.shape == q.shape
+
+    return _qmul_out(q, r, out)
+
+
+@torch.jit.script
+def _qrot(q, v):
+    """
+    Rotation v' = v + 2 * (q0 * (qvec x v) + qvec x (qvec x v)) with the
+    two cross products written out component-wise, so the whole rotation
+    fuses into a single pointwise kernel (no torch.cross temporaries).
+    """
+
+    q0 = q.select(-1, 0)
+    qx = q.select(-1, 1)
+    qy = q.select(-1, 2)
+    qz = q.select(-1, 3)
+
+    vx = v.select(-1, 0)
+    vy = v.select(-1, 1)
+    vz = v.select(-1, 2)
+
+    # uv = qvec x v
+    uvx = qy*vz - qz*vy
+    uvy = qz*vx - qx*vz
+    uvz = qx*vy - qy*vx
+
+    # uuv = qvec x uv
+    uuvx = qy*uvz - qz*uvy
+    uuvy = qz*uvx - qx*uvz
+    uuvz = qx*uvy - qy*uvx
+
+    return torch.stack( [ vx + 2 * (q0*uvx + uuvx) ,
+                          vy + 2 * (q0*uvy + uuvy) ,
+                          vz + 2 * (q0*uvz + uuvz) ], dim = -1 )
 
 
 def qrot(q, v):
@@ -47,7 +168,7 @@ def qrot(q, v):
         * q : tensor with dimensions (N, 4) ; quaternion(s)
         * v : tensor with dimensions (N, 3) ; vector(s)
 
-        n -> number os quaternions/vectors in the tensors 
+        n -> number os quaternions/vectors in the tensors
     Output
     ------
         * Tensor with dimension (N, 3) ; vector(s) rotated
@@ -57,21 +178,63 @@ def qrot(q, v):
     assert v.shape[-1] == 3
     assert q.shape[:-1] == v.shape[:-1]
 
-    original_shape = list(v.shape)
-
-    q = q.view(-1, 4)
-    v = v.view(-1, 3)
-
-    qvec = q[:, 1:]
-    uv = torch.cross( qvec, v, dim = 1 )
-    uuv = torch.cross( qvec, uv, dim = 1)
-
-    return ( v + 2 * ( q[:,:1] * uv + uuv ) ).view( original_shape )
+    return _qrot(q, v)
+
+
+@torch.jit.script
+def _qeuler_xyz(q0, q1, q2, q3, epsilon : float):
+    x = torch.atan2( 2 * (q0*q1 - q2*q3) , 1 - 2 * (q1*q1 + q2*q2) )
+    y = torch.asin( torch.clamp( 2 * (q1*q3 + q0*q2), -1 + epsilon, 1 - epsilon) )
+    z = torch.atan2( 2 * (q0*q3 - q1*q2), 1 - 2 * (q2*q2 + q3*q3) )
+    return torch.stack( [x,y,z], dim = -1 )
+
+@torch.jit.script
+def _qeuler_yzx(q0, q1, q2, q3, epsilon : float):
+    x = torch.atan2( 2 * (q0*q1 - q2*q3) , 1 - 2 * (q1*q1 + q3*q3) )
+    y = torch.atan2( 2 * (q0*q2 -q1*q3) , 1 - 2 * (q2*q2 + q3*q3) )
+    z = torch.asin( torch.clamp( 2 * (q1*q2 + q0*q3), -1 + epsilon, 1- epsilon) )
+    return torch.stack( [x,y,z], dim = -1 )
+
+@torch.jit.script
+def _qeuler_zxy(q0, q1, q2, q3, epsilon : float):
+    x = torch.asin( torch.clamp( 2 * (q0*q1 + q2*q3), -1 + epsilon, 1 - epsilon) )
+    y = torch.atan2( 2 * (q0*q2 - q1*q3) , 1 - 2 * (q1*q1 + q2*q2) )
+    z = torch.atan2( 2 * (q0*q3 - q1*q2), 1 - 2 * (q1*q1 + q3*q3) )
+    return torch.stack( [x,y,z], dim = -1 )
+
+@torch.jit.script
+def _qeuler_xzy(q0, q1, q2, q3, epsilon : float):
+    x = torch.atan2( 2 * (q0*q1 + q2*q3), 1 - 2 * (q1*q1 + q3*q3) )
+    y = torch.atan2( 2 * (q0*q2 + q1*q3), 1 - 2 * (q2*q2 + q3*q3) )
+    z = torch.asin( torch.clamp(2 * (q0*q3 - q1*q2), -1 + epsilon, 1 - epsilon) )
+    return torch.stack( [x,y,z], dim = -1 )
+
+@torch.jit.script
+def _qeuler_yxz(q0, q1, q2, q3, epsilon : float):
+    x = torch.asin( torch.clamp( 2 * (q0*q1 - q2*q3), -1 + epsilon, 1 - epsilon) )
+    y = torch.atan2( 2 * (q1*q3 + q0*q2), 1 - 2 * (q1*q1 + q2*q2) )
+    z = torch.atan2( 2 * (q1*q2 + q0*q3), 1 - 2 * (q1*q1 + q3*q3) )
+    return torch.stack( [x,y,z], dim = -1 )
+
+@torch.jit.script
+def _qeuler_zyx(q0, q1, q2, q3, epsilon : float):
+    x = torch.atan2( 2 * (q0*q1 + q2*q3), 1 - 2 * (q1*q1 + q2*q2) )
+    y = torch.asin( torch.clamp( 2 * (q0*q2 - q1*q3), -1 + epsilon , 1 - epsilon) )
+    z = torch.atan2( 2 * (q0*q3 + q1*q2), 1 - 2 * (q2*q2 + q3*q3) )
+    return torch.stack( [x,y,z], dim = -1 )
+
+# one fused kernel per rotation order, selected with a single dict lookup
+_QEULER_DISPATCH = { 'xyz' : _qeuler_xyz ,
+                     'yzx' : _qeuler_yzx ,
+                     'zxy' : _qeuler_zxy ,
+                     'xzy' : _qeuler_xzy ,
+                     'yxz' : _qeuler_yxz ,
+                     'zyx' : _qeuler_zyx }
 
 
 def qeuler(q, order, epsilon = 0):
     """
-    Convert quaternion(s) q to Euler Angles 
+    Convert quaternion(s) q to Euler Angles
     Input
     ------
         * q : Tensor with dimensions (N, 4) ;  quaternion(s)
@@ -83,49 +246,92 @@ def qeuler(q, order, epsilon = 0):
     """
 
     assert q.shape[-1] == 4
-    
+
     original_shape = list(q.shape)
     original_shape[-1] = 3
-    
+
     q = q.view(-1, 4)
     q0 = q[:, 0]
     q1 = q[:, 1]
     q2 = q[:, 2]
     q3 = q[:, 3]
-    
-    if order == 'xyz':
-        x = torch.atan2( 2 * (q0*q1 - q2*q3) , 1 - 2 * (q1*q1 + q2*q2) )
-        y = torch.asin( torch.clamp( 2 * (q1*q3 + q0*q2), -1 + epsilon, 1 - epsilon) )
-        z = torch.atan2( 2 * (q0*q3 - q1*q2), 1 - 2 * (q2*q2 + q3*q3) )
-    elif order == 'yzx':
-        x = torch.atan2( 2 * (q0*q1 - q2*q3) , 1 - 2 * (q1*q1 + q3*q3) )
-        y = torch.atan2( 2 * (q0*q2 -q1*q3) , 1 - 2 * (q2*q2 + q3*q3) )
-        z = torch.asin( torch.clamp( 2 * (q1*q2 + q0*q3), -1 + epsilon, 1- epsilon) )
-    elif order == 'zxy':
-        x = torch.asin( torch.clamp( 2 * (q0*q1 + q2*q3), -1 + epsilon, 1 - epsilon) )
-        y = torch.atan2( 2 * (q0*q2 - q1*q3) , 1 - 2 * (q1*q1 + q2*q2) )
-        z = torch.atan2( 2 * (q0*q3 - q1*q2), 1 - 2 * (q1*q1 + q3*q3) )
-    elif order == 'xzy':
-        x = torch.atan2( 2 * (q0*q1 + q2*q3), 1 - 2 * (q1*q1 + q3*q3) )
-        y = torch.atan2( 2 * (q0*q2 + q1*q3), 1 - 2 * (q2*q2 + q3*q3) )
-        z = torch.asin( torch.clamp(2 * (q0*q3 - q1*q2), -1 + epsilon, 1 - epsilon) )
-    elif order == 'yxz':
-        x = torch.asin( torch.clamp( 2 * (q0*q1 - q2*q3), -1 + epsilon, 1 - epsilon) )
-        y = torch.atan2( 2 * (q1*q3 + q0*q2), 1 - 2 * (q1*q1 + q2*q2) )
-        z = torch.atan2( 2 * (q1*q2 + q0*q3), 1 - 2 * (q1*q1 + q3*q3) )
-    elif order == 'zyx':
-        x = torch.atan2( 2 * (q0*q1 + q2*q3), 1 - 2 * (q1*q1 + q2*q2) )
-        y = torch.asin( torch.clamp( 2 * (q0*q2 - q1*q3), -1 + epsilon , 1 - epsilon) )
-        z = torch.atan2( 2 * (q0*q3 + q1*q2), 1 - 2 * (q2*q2 + q3*q3) )
-    else:
-        raise
-        
-    return torch.stack( (x,y,z), dim=1 ).view(original_shape)
+
+    return _QEULER_DISPATCH[order]( q0, q1, q2, q3, float(epsilon) ).view(original_shape)
 
 
 
 # Numpy based implementations of Quaternion methods
 
+# Optional Numba acceleration: the _np methods below fall back to the
+# PyTorch kernels when numba is not installed.
+try:
+    from numba import njit, prange
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    _NUMBA_AVAILABLE = False
+
+if _NUMBA_AVAILABLE:
+
+    import math
+
+    @njit( fastmath = True, cache = True, parallel = True )
+    def _qmul_numba(q, r, out):
+        for i in prange(q.shape[0]):
+            q0, q1, q2, q3 = q[i, 0], q[i, 1], q[i, 2], q[i, 3]
+            r0, r1, r2, r3 = r[i, 0], r[i, 1], r[i, 2], r[i, 3]
+            out[i, 0] = q0*r0 - q1*r1 - q2*r2 - q3*r3
+            out[i, 1] = q0*r1 + q1*r0 + q2*r3 - q3*r2
+            out[i, 2] = q0*r2 + q2*r0 + q3*r1 - q1*r3
+            out[i, 3] = q0*r3 + q3*r0 + q1*r2 - q2*r1
+
+    @njit( fastmath = True, cache = True, parallel = True )
+    def _qrot_numba(q, v, out):
+        for i in prange(q.shape[0]):
+            q0, qx, qy, qz = q[i, 0], q[i, 1], q[i, 2], q[i, 3]
+            vx, vy, vz = v[i, 0], v[i, 1], v[i, 2]
+            # uv = qvec x v ; uuv = qvec x uv
+            uvx = qy*vz - qz*vy
+            uvy = qz*vx - qx*vz
+            uvz = qx*vy - qy*vx
+            uuvx = qy*uvz - qz*uvy
+            uuvy = qz*uvx - qx*uvz
+            uuvz = qx*uvy - qy*uvx
+            out[i, 0] = vx + 2 * (q0*uvx + uuvx)
+            out[i, 1] = vy + 2 * (q0*uvy + uuvy)
+            out[i, 2] = vz + 2 * (q0*uvz + uuvz)
+
+    @njit( fastmath = True, cache = True, parallel = True )
+    def _qeuler_numba(q, order, epsilon, out):
+        lo = -1 + epsilon
+        hi = 1 - epsilon
+        for i in prange(q.shape[0]):
+            q0, q1, q2, q3 = q[i, 0], q[i, 1], q[i, 2], q[i, 3]
+            if order == 'xyz':
+                out[i, 0] = math.atan2( 2 * (q0*q1 - q2*q3) , 1 - 2 * (q1*q1 + q2*q2) )
+                out[i, 1] = math.asin( min( max( 2 * (q1*q3 + q0*q2), lo ), hi ) )
+                out[i, 2] = math.atan2( 2 * (q0*q3 - q1*q2), 1 - 2 * (q2*q2 + q3*q3) )
+            elif order == 'yzx':
+                out[i, 0] = math.atan2( 2 * (q0*q1 - q2*q3) , 1 - 2 * (q1*q1 + q3*q3) )
+                out[i, 1] = math.atan2( 2 * (q0*q2 - q1*q3) , 1 - 2 * (q2*q2 + q3*q3) )
+                out[i, 2] = math.asin( min( max( 2 * (q1*q2 + q0*q3), lo ), hi ) )
+            elif order == 'zxy':
+                out[i, 0] = math.asin( min( max( 2 * (q0*q1 + q2*q3), lo ), hi ) )
+                out[i, 1] = math.atan2( 2 * (q0*q2 - q1*q3) , 1 - 2 * (q1*q1 + q2*q2) )
+                out[i, 2] = math.atan2( 2 * (q0*q3 - q1*q2), 1 - 2 * (q1*q1 + q3*q3) )
+            elif order == 'xzy':
+                out[i, 0] = math.atan2( 2 * (q0*q1 + q2*q3), 1 - 2 * (q1*q1 + q3*q3) )
+                out[i, 1] = math.atan2( 2 * (q0*q2 + q1*q3), 1 - 2 * (q2*q2 + q3*q3) )
+                out[i, 2] = math.asin( min( max( 2 * (q0*q3 - q1*q2), lo ), hi ) )
+            elif order == 'yxz':
+                out[i, 0] = math.asin( min( max( 2 * (q0*q1 - q2*q3), lo ), hi ) )
+                out[i, 1] = math.atan2( 2 * (q1*q3 + q0*q2), 1 - 2 * (q1*q1 + q2*q2) )
+                out[i, 2] = math.atan2( 2 * (q1*q2 + q0*q3), 1 - 2 * (q1*q1 + q3*q3) )
+            else: # 'zyx'
+                out[i, 0] = math.atan2( 2 * (q0*q1 + q2*q3), 1 - 2 * (q1*q1 + q2*q2) )
+                out[i, 1] = math.asin( min( max( 2 * (q0*q2 - q1*q3), lo ), hi ) )
+                out[i, 2] = math.atan2( 2 * (q0*q3 + q1*q2), 1 - 2 * (q2*q2 + q3*q3) )
+
+
 def qmul_np(q, r):
     """
     Multiply quaternion(s) q with quaternion(s) r.
@@ -140,7 +346,14 @@ def qmul_np(q, r):
     ------
         * numpy array with dimensions (N ,4) ; quaternions product
     """
-    
+
+    if _NUMBA_AVAILABLE:
+        flat_q = np.ascontiguousarray(q).reshape(-1, 4)
+        flat_r = np.ascontiguousarray(r).reshape(-1, 4)
+        out = np.empty_like(flat_q)
+        _qmul_numba(flat_q, flat_r, out)
+        return out.reshape(q.shape)
+
     q = torch.from_numpy(q).contiguous()
     r = torch.from_numpy(r).contiguous()
 
@@ -161,6 +374,13 @@ def qrot_np(q, v):
         * numpy array with dimension (N, 3) ; vector(s) rotated
     """
 
+    if _NUMBA_AVAILABLE:
+        flat_q = np.ascontiguousarray(q).reshape(-1, 4)
+        flat_v = np.ascontiguousarray(v).reshape(-1, 3)
+        out = np.empty_like(flat_v)
+        _qrot_numba(flat_q, flat_v, out)
+        return out.reshape(v.shape)
+
     q = torch.from_numpy(q).contiguous()
     v = torch.from_numpy(v).contiguous()
 
@@ -184,6 +404,15 @@ def qeuler_np(q, order, epsilon = 0, use_gpu = False):
     if use_gpu:
         q = torch.from_numpy(q).cuda()
         return qeuler(q, order, epsilon).cpu().numpy()
+    elif _NUMBA_AVAILABLE:
+        if order not in _QEULER_DISPATCH:
+            raise KeyError(order)
+        original_shape = list(q.shape)
+        original_shape[-1] = 3
+        flat_q = np.ascontiguousarray(q).reshape(-1, 4)
+        out = np.empty( (flat_q.shape[0], 3), dtype = flat_q.dtype )
+        _qeuler_numba(flat_q, order, float(epsilon), out)
+        return out.reshape(original_shape)
     else:
         q = torch.from_numpy(q).contiguous()
         return qeuler(q, order, epsilon).numpy()
@@ -8,7 +8,7 @@ import os
 import errno
 import numpy as np
 from common.mocap_dataset import MocapDataset
-from common.quaternion import qeuler_np
+from common.quaternion import qeuler, qeuler_np
 from models.pose_network_ensemble import PoseNetworkEnsemble
 from dataset_h36m import dataset, subjects_test, short_term_weights_path
 from tqdm import tqdm
@@ -76,13 +76,13 @@ def build_sequence_map_srnn(data):
     return out
 
 
-def get_test_data(data, action, subject):
+def get_test_data(seq_map, action, subject):
     """
     Generate test sequences chunks.
     From: https://github.com/una-dinosauria/human-motion-prediction
     Input
     -----
-        * data    : dataset object.
+        * seq_map : sequence map generated with build_sequence_map_srnn().
         * action  : action name.
         * subject : subject number.
     Output
@@ -90,7 +90,6 @@ def get_test_data(data, action, subject):
         * out : test chunks.
     """
 
-    seq_map = build_sequence_map_srnn(data)
     num_seeds = 8
     prefix_length = 50
     target_length = 100
@@ -127,32 +126,43 @@ def evaluate(model, test_data):
         * errors : Root Mean Squared Error (Euler angles).
     """
 
-    errors = []
-    errors_joint = np.zeros( ( len(test_data), np.max(frame_targets) + 1, model.num_joints ) )
-    for i, d in enumerate(test_data):
-        source = np.concatenate( (d[0][:,model.selected_joints], d[1][:1,model.selected_joints]), 
-                                 axis = 0).reshape( -1, model.num_joints*4 )
-        target = d[2][:,model.selected_joints].reshape(-1, model.num_joints*4)
-
-        if model is None:
-            target_predicted = np.tile( source[-1], target.shape[0] ).reshape(-1, model.num_joints*4)
-        else:
-            target_predicted = model.predict(
-                np.expand_dims(source, 0), target_length = np.max(frame_targets) + 1 
-            ).reshape(-1, model.num_joints*4)
-            
-        target = qeuler_np( target[:target_predicted.shape[0]].reshape(-1,4), 'zyx' ).reshape(-1, model.num_joints, 3)
-        target_predicted = qeuler_np( target_predicted.reshape(-1,4), 'zyx').reshape(-1, model.num_joints, 3)
-        
-        e_joint = np.sqrt( np.sum( (target_predicted - target)**2, axis = 2 ) )
-        e = np.sqrt( np.sum( (target_predicted.reshape(-1, model.num_joints*3)[:,3:] - target.reshape(-1, model.num_joints*3)[:,3:] )**2, axis = 1 ) )
-
-        errors.append(e)
-        errors_joint[i,:,:] = e_joint
-    errors = np.mean( np.array(errors), axis = 0 )
-    errors_joint = np.mean( errors_joint, axis = 0 )
-    
-    return errors, errors_joint
+    num_seeds = len(test_data)
+    target_length = np.max(frame_targets) + 1
+
+    sources = np.stack( [ np.concatenate( (d[0][:,model.selected_joints], d[1][:1,model.selected_joints]),
+                                          axis = 0 ).reshape( -1, model.num_joints*4 ) for d in test_data ] )
+    targets = np.stack( [ d[2][:,model.selected_joints].reshape(-1, model.num_joints*4) for d in test_data ] )
+
+    if model is None:
+        targets_predicted = np.tile( sources[:, -1:], (1, target_length, 1) )
+    else:
+        # one batched rollout over all seeds, instead of 8 batch-1 calls
+        targets_predicted = model.predict( sources, target_length = target_length ).reshape(
+            num_seeds, target_length, -1 )
+
+    targets = targets[:, :targets_predicted.shape[1]]
+
+    # error metric in one vectorized pass on the GPU (when available),
+    # with a single copy back to the CPU at the end
+    use_gpu = model is not None and model.use_cuda
+    targets_t = torch.from_numpy( targets.astype('float32') )
+    predicted_t = torch.from_numpy( targets_predicted.astype('float32') )
+    if use_gpu:
+        targets_t = targets_t.cuda()
+        predicted_t = predicted_t.cuda()
+
+    targets_euler = qeuler( targets_t.reshape(-1, 4), 'zyx' ).reshape(
+        num_seeds, -1, model.num_joints, 3 )
+    predicted_euler = qeuler( predicted_t.reshape(-1, 4), 'zyx' ).reshape(
+        num_seeds, -1, model.num_joints, 3 )
+
+    diff = predicted_euler - targets_euler
+    errors_joint = torch.sqrt( torch.sum( diff**2, dim = 3 ) ).mean( dim = 0 )
+    # the root joint is excluded from the aggregate error, as before
+    errors = torch.sqrt( torch.sum(
+        (diff[:, :, 1:]**2).reshape( num_seeds, diff.shape[1], -1 ), dim = 2 ) ).mean( dim = 0 )
+
+    return errors.cpu().numpy(), errors_joint.cpu().numpy()
 
 
 frame_targets = [1, 3, 7, 9, 14, 19, 24, 49, 74, 99] # 80, 160, 320, and 400 ms (at 25 Hz)
@@ -204,10 +214,14 @@ def run_evaluation( model = None, file_path = 'test.csv', directory_path = ''):
     test_file = open(file_path, 'w')
     test_file.write('subject,action,time(ms),error\n')
 
+    # build the sequence map once, instead of rescanning the whole
+    # dataset for every (subject, action) pair
+    seq_map = build_sequence_map_srnn(dataset)
+
     print('Testing on subjects: ', subjects_test)
     for subject_test in tqdm(subjects_test):
         for idx, action in enumerate( actions ):
-            test_data = get_test_data( dataset, action, int(subject_test[1:]) )
+            test_data = get_test_data( seq_map, action, int(subject_test[1:]) )
             errors, errors_joint = evaluate(model, test_data)
             all_errors[idx] = errors
             for f, e in zip(frame_targets, errors[frame_targets] ):
@@ -244,4 +258,10 @@ if __name__ == '__main__':
 
     model.load_weights(short_term_weights_path)
     model.eval()
+    if not torch.cuda.is_available():
+        # int8 dynamic quantization of the linear layers for CPU runs
+        model.quantize()
+    model.compile_model()
+    if torch.cuda.is_available():
+        model.enable_cuda_graphs()
     run_evaluation(model)
\ No newline at end of file
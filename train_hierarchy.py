@@ -57,6 +57,11 @@ if __name__ == '__main__':
         model.cuda()
     # ------------------------------------------------
 
+    # Compute Euler angles in dataset once (in case of using the loss
+    # function based on euler angles); the rotations do not change
+    # between training stages.
+    dataset.compute_euler_angles( order = 'zyx' )
+
     for i in range( len(selected_list) ):
         
         # Set joints selection
@@ -81,10 +86,7 @@ if __name__ == '__main__':
         
         # Define prediction target length
         target_length = 10
-        
-        # Compute Euler angles in dataset (in case of using the loss function based on euler angles)
-        dataset.compute_euler_angles( order = 'zyx' )
-        
+
         train_params = { 'lr' : 0.001 * (0.999**(1000*i)),
                          'lr_decay' : 0.999      ,
                          'tf_ratio' : 1 * (0.995**(1000*i)),